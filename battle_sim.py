@@ -11,20 +11,40 @@ Key features
 
 Usage
 -----
-from battle_sim import simulate_battle, default_units, make_army
+from battle_sim import simulate_battle, simulate_battles, default_units, make_army
 
 army_a = make_army({"Peasants": 95, "Swordsmen": 5})
 army_b = make_army({"Peasants": 90, "Peasants_1HP": 5, "Swordsmen": 4, "Swordsmen_1HP": 1})
 report = simulate_battle(army_a, army_b, seed=42)
 print(report["summary"])
+
+# Monte-Carlo: many independent battles in one vectorized run
+batch = simulate_battles(army_a, army_b, n_sims=10_000, seed=42)
+print(batch["win_prob"])
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Tuple, List, Any
+from typing import Dict, Tuple, List, Any, Callable
 from collections import defaultdict, Counter
+from collections.abc import Mapping, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import math
+import os
 import numpy as np
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional; kernels then run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
 # ------------------------- Unit definitions -------------------------
 
 @dataclass(frozen=True)
@@ -73,156 +93,448 @@ def army_size(army: Army) -> int:
 def alive_types(army: Army) -> List[str]:
     return [unit_type for unit_type, count in army.items() if count > 0]
 
+class ArmySnapshot(Mapping):
+    """
+    Read-only {unit_type: count} view over a count array, as stored in round
+    reports. The dict is only built on first access; until then recording a
+    round costs one array copy instead of a dict per army.
+    """
+    __slots__ = ("_names", "_counts", "_army")
+
+    def __init__(self, names: List[str], counts: np.ndarray):
+        self._names = names
+        self._counts = counts
+        self._army: Army | None = None
+
+    def _materialize(self) -> Army:
+        if self._army is None:
+            self._army = {unit_type: count for unit_type, count in zip(self._names, self._counts.tolist()) if count > 0}
+        return self._army
+
+    def __getitem__(self, unit_type: str) -> int:
+        return self._materialize()[unit_type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __repr__(self) -> str:
+        return repr(self._materialize())
+
 # ------------------------- Combat resolution -------------------------
+# On the hot path each army is held as fixed-shape int64 counts indexed by
+# unit type; types an army doesn't have simply carry a count of 0. Per-type
+# probabilities live in parallel float64 tables built once per unit table:
+# ATK_P[i] = chance to produce a hit, PEN_P[i] = chance a hit gets through.
+
+def _build_unit_tables(unit_defs: Dict[str, UnitDef]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    idx_of = {unit_type: i for i, unit_type in enumerate(unit_defs)}
+    atk_p = np.fromiter((u.attack / 100.0 for u in unit_defs.values()), dtype=np.float64, count=len(unit_defs))
+    pen_p = np.fromiter((1.0 - u.defense / 100.0 for u in unit_defs.values()), dtype=np.float64, count=len(unit_defs))
+    return idx_of, np.clip(atk_p, 0.0, 1.0), np.clip(pen_p, 0.0, 1.0)
+
+# Tables for default_units, fixing the unit type order of the arrays
+TYPE_INDEX, ATK_P, PEN_P = _build_unit_tables(default_units)
+
+def _unit_tables(unit_defs: Dict[str, UnitDef]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Return (type -> index, ATK_P, PEN_P) for a unit table.
+    """
+    if unit_defs is default_units:
+        return TYPE_INDEX, ATK_P, PEN_P
+    return _build_unit_tables(unit_defs)
+
+def _army_counts(army: Army, idx_of: Dict[str, int]) -> np.ndarray:
+    """
+    Convert an Army mapping into a count array indexed like idx_of.
+    """
+    counts = np.zeros(len(idx_of), dtype=np.int64)
+    for unit_type, count in army.items():
+        if unit_type not in idx_of:
+            raise ValueError(f"Unknown unit type: {unit_type}")
+        if count > 0:
+            counts[idx_of[unit_type]] = count
+    return counts
 
-def _binomial_rng(rng: np.random.Generator, n: int, p: float) -> int:
-    if n <= 0 or p <= 0:
+def _counts_to_dict(names: List[str], counts: np.ndarray) -> Dict[str, int]:
+    return {unit_type: count for unit_type, count in zip(names, counts.tolist()) if count > 0}
+
+# n*p below which _rand_binomial uses inversion (BINV) instead of BTRS.
+# BTRS needs n*p >= 10; the measured crossover on x86-64 was around 15-20.
+BINOMIAL_INVERSION_THRESHOLD = 16.0
+
+@njit(cache=True)
+def _binomial_inversion(rng, n, p):
+    """
+    BINV (Kachitvichyanukul & Schmeiser 1988): walk the CDF from 0 with the
+    pmf recurrence. Expected cost O(n*p); used for small means, p <= 0.5.
+    """
+    q = 1.0 - p
+    s = p / q
+    a = (n + 1) * s
+    while True:
+        r = q ** n
+        u = rng.random()
+        x = 0
+        while u > r:
+            u -= r
+            x += 1
+            if x > n:
+                break
+            r *= a / x - s
+        if x <= n:
+            return x
+
+@njit(cache=True)
+def _binomial_btrs(rng, n, p):
+    """
+    BTRS (Hormann 1993): transformed rejection with squeeze. Constant
+    expected cost; valid for n*p >= 10, p <= 0.5.
+    """
+    spq = math.sqrt(n * p * (1.0 - p))
+    b = 1.15 + 2.53 * spq
+    a = -0.0873 + 0.0248 * b + 0.01 * p
+    c = n * p + 0.5
+    v_r = 0.92 - 4.2 / b
+    alpha = (2.83 + 5.1 / b) * spq
+    lpq = math.log(p / (1.0 - p))
+    m = math.floor((n + 1) * p)
+    h = math.lgamma(m + 1.0) + math.lgamma(n - m + 1.0)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        k = math.floor((2.0 * a / us + b) * u + c)
+        if k < 0 or k > n:
+            continue
+        if us >= 0.07 and v <= v_r:
+            return k
+        v = math.log(v * alpha / (a / (us * us) + b))
+        if v <= h - math.lgamma(k + 1.0) - math.lgamma(n - k + 1.0) + (k - m) * lpq:
+            return k
+
+@njit(cache=True)
+def _rand_binomial(rng, n, p):
+    """
+    Binomial(n, p) draw for the compiled kernels: inversion for small n*p,
+    BTRS otherwise, with p > 0.5 handled by symmetry.
+    """
+    if n <= 0 or p <= 0.0:
         return 0
-    p = min(max(p, 0.0), 1.0)
-    return int(rng.binomial(n, p))
+    if p >= 1.0:
+        return n
+    flipped = p > 0.5
+    if flipped:
+        p = 1.0 - p
+    if n * p < BINOMIAL_INVERSION_THRESHOLD:
+        k = _binomial_inversion(rng, n, p)
+    else:
+        k = _binomial_btrs(rng, n, p)
+    return n - k if flipped else k
+
+@njit(cache=True)
+def multinomial_cond(rng: np.random.Generator, n: int, probs: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Multinomial draw of n trials into out, as a chain of conditional Binomials:
+    out[j] ~ Binomial(n - sum(out[:j]), probs[j] / sum(probs[j:])).
+    probs need not be normalized; zero entries get zero draws.
+    """
+    remaining_n = n
+    remaining_p = 0.0
+    for j in range(probs.shape[0]):
+        remaining_p += probs[j]
+    for j in range(probs.shape[0]):
+        if remaining_n <= 0 or remaining_p <= 0.0 or probs[j] <= 0.0:
+            out[j] = 0
+        else:
+            p = min(probs[j] / remaining_p, 1.0)
+            out[j] = _rand_binomial(rng, remaining_n, p)
+            remaining_n -= out[j]
+        remaining_p -= probs[j]
+    return out
 
 def _multinomial_rng(rng: np.random.Generator, n: int, probs: np.ndarray) -> np.ndarray:
-    if n <= 0:
-        return np.zeros_like(probs, dtype=int)
-    # normalize defensively
+    # NumPy path: one C-level multinomial call beats a Python-level chain of
+    # binomials; zero-weight entries (dead types) simply draw 0
     total = probs.sum()
-    if total <= 0:
-        # if somehow no defenders, return zeros
-        return np.zeros_like(probs, dtype=int)
-    probs = probs / total
-    draws = rng.multinomial(n, probs)
-    return draws.astype(int)
+    if n <= 0 or total <= 0:
+        return np.zeros(probs.shape[0], dtype=np.int64)
+    return rng.multinomial(n, probs / total)
 
-def _attacks_to_hits(attacker: Army, rng: np.random.Generator) -> int:
+def _attacks_to_hits(counts: np.ndarray, atk_p: np.ndarray, rng: np.random.Generator) -> np.ndarray:
     """
-    For each unit type, sample # of successful hits via Binomial.
-    Sum over all unit types to get total hits produced by the attacking army.
+    Sample # of successful hits for every unit type with one Binomial call.
+    Sum over unit types (last axis) to get total hits per attacking army;
+    pass stacked rows to roll several armies in the same call.
     """
-    total_hits = 0
-    for unit_type, count in attacker.items():
-        if count <= 0:
-            continue
-        atk_pct = default_units[unit_type].attack / 100.0
-        total_hits += _binomial_rng(rng, count, atk_pct)
-    return int(total_hits)
+    return rng.binomial(counts, atk_p).sum(axis=-1)
 
-def _distribute_hits_across_defender(defender: Army, total_hits: int, rng: np.random.Generator) -> Dict[str, int]:
+def _distribute_hits_across_defender(counts: np.ndarray, total_hits: int, rng: np.random.Generator) -> np.ndarray:
     """
     Distribute total hits proportionally across all defender unit types
     using a Multinomial with probabilities proportional to counts.
     """
-    unit_types = alive_types(defender)
-    if not unit_types or total_hits <= 0:
-        return {}
-    counts = np.array([defender[unit_type] for unit_type in unit_types], dtype=float)
-    draws = _multinomial_rng(rng, total_hits, counts)
-    return {unit_types[i]: int(draws[i]) for i in range(len(unit_types)) if draws[i] > 0}
+    return _multinomial_rng(rng, total_hits, counts)
 
-def _defense_resolution(assigned_hits: Dict[str, int], rng: np.random.Generator) -> Dict[str, int]:
+def _fused_kills(counts: np.ndarray, pen_p: np.ndarray, total_hits: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Fast mode: distribute and resolve hits in one Multinomial. A hit kills a
+    unit of type j with probability counts[j] * pen_p[j] / counts.sum(); the
+    leftover probability mass is the "deflected" category, which is dropped.
+    """
+    weights = counts * pen_p
+    probs = np.append(weights, max(counts.sum() - weights.sum(), 0.0))
+    return _multinomial_rng(rng, total_hits, probs)[:-1]
+
+def _defense_resolution(assigned_hits: np.ndarray, pen_p: np.ndarray, rng: np.random.Generator) -> np.ndarray:
     """
     For each defender unit type, some assigned hits are deflected by defense %.
     Return penetrating hits (kills) per unit type.
     """
-    kills: Dict[str, int] = {}
-    for unit_type, hits in assigned_hits.items():
-        if hits <= 0:
-            continue
-        def_pct = default_units[unit_type].defense / 100.0
-        # probability to penetrate (kill) = 1 - def_pct
-        pen = _binomial_rng(rng, hits, max(0.0, 1.0 - def_pct))
-        if pen > 0:
-            kills[unit_type] = pen
-    return kills
-
-def _apply_kills(army: Army, kills: Dict[str, int]) -> Dict[str, int]:
-    """
-    Apply kills directly to the army. Hit = Death.
-    Returns actual casualties per unit type.
-    """
-    actual_kills: Dict[str, int] = {}
-    
-    for unit_type, kill_count in kills.items():
-        if kill_count <= 0:
-            continue
-        available = army.get(unit_type, 0)
-        if available <= 0:
-            continue
-        
-        # Can't kill more than what's available
-        actual_kill_count = min(kill_count, available)
-        army[unit_type] = available - actual_kill_count
-        
-        # Remove empty unit types
-        if army[unit_type] <= 0:
-            del army[unit_type]
-            
-        actual_kills[unit_type] = actual_kill_count
-    
-    return actual_kills
+    return rng.binomial(assigned_hits, pen_p)
+
+def _run_round_numpy(A_cnt: np.ndarray, B_cnt: np.ndarray,
+                     A_atk: np.ndarray, A_pen: np.ndarray,
+                     B_atk: np.ndarray, B_pen: np.ndarray,
+                     rng: np.random.Generator,
+                     fast: bool = False) -> Tuple[int, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    One round of combat with vectorized NumPy calls; same contract as run_round.
+    """
+    # Both sides roll in the same Binomial calls: row 0 is A, row 1 is B.
+    # Armies share the fixed type order, so the rows line up without padding,
+    # and a probability table shared by both sides just broadcasts.
+    atk2 = A_atk if A_atk is B_atk else np.stack([A_atk, B_atk])
+    a_hits, b_hits = _attacks_to_hits(np.stack([A_cnt, B_cnt]), atk2, rng).tolist()
+
+    if fast:
+        a_kills = _fused_kills(B_cnt, B_pen, a_hits, rng)
+        b_kills = _fused_kills(A_cnt, A_pen, b_hits, rng)
+        return a_hits, b_hits, np.zeros_like(B_cnt), np.zeros_like(A_cnt), a_kills, b_kills
+
+    a_assign = _distribute_hits_across_defender(B_cnt, a_hits, rng)  # A's hits on B
+    b_assign = _distribute_hits_across_defender(A_cnt, b_hits, rng)  # B's hits on A
+    pen2 = A_pen if A_pen is B_pen else np.stack([B_pen, A_pen])
+    a_kills, b_kills = _defense_resolution(np.stack([a_assign, b_assign]), pen2, rng)
+
+    return a_hits, b_hits, a_assign, b_assign, a_kills, b_kills
+
+@njit(cache=True)
+def _attack_kernel(rng, att_cnt, att_atk, def_cnt, def_pen, assign, kills, fast):
+    hits = 0
+    for i in range(att_cnt.shape[0]):
+        if att_cnt[i] > 0 and att_atk[i] > 0.0:
+            hits += _rand_binomial(rng, att_cnt[i], att_atk[i])
+    if fast:
+        # Same chain as multinomial_cond over weights def_cnt[j] * def_pen[j],
+        # with the full count as total mass; hits left over were deflected.
+        remaining_n = hits
+        remaining_w = 0.0
+        for j in range(def_cnt.shape[0]):
+            remaining_w += def_cnt[j]
+        for j in range(def_cnt.shape[0]):
+            w = def_cnt[j] * def_pen[j]
+            if remaining_n <= 0 or remaining_w <= 0.0 or w <= 0.0:
+                kills[j] = 0
+            else:
+                kills[j] = _rand_binomial(rng, remaining_n, min(w / remaining_w, 1.0))
+                remaining_n -= kills[j]
+            remaining_w -= w
+        return hits
+    multinomial_cond(rng, hits, def_cnt, assign)
+    for j in range(def_cnt.shape[0]):
+        kills[j] = _rand_binomial(rng, assign[j], def_pen[j])
+    return hits
+
+@njit(cache=True)
+def run_round(A_cnt, B_cnt, A_atk, A_pen, B_atk, B_pen, rng, fast=False):
+    """
+    One round of combat: hits -> distribute -> defense for both sides,
+    computed from the start-of-round counts (nothing is applied here).
+    Returns (a_hits, b_hits, a_assign, b_assign, a_kills, b_kills); the
+    per-type arrays are indexed like the defending army.
+    With fast=True distribution and defense are one fused draw and the
+    assign arrays are left at zero.
+    """
+    a_assign = np.zeros(B_cnt.shape[0], dtype=np.int64)
+    a_kills = np.zeros(B_cnt.shape[0], dtype=np.int64)
+    b_assign = np.zeros(A_cnt.shape[0], dtype=np.int64)
+    b_kills = np.zeros(A_cnt.shape[0], dtype=np.int64)
+    a_hits = _attack_kernel(rng, A_cnt, A_atk, B_cnt, B_pen, a_assign, a_kills, fast)
+    b_hits = _attack_kernel(rng, B_cnt, B_atk, A_cnt, A_pen, b_assign, b_kills, fast)
+    return a_hits, b_hits, a_assign, b_assign, a_kills, b_kills
+
+# Army size below which a side counts as destroyed in analytic mode
+ANALYTIC_MIN_SIZE = 0.5
+
+def _expected_round(A_cnt: np.ndarray, B_cnt: np.ndarray,
+                    A_atk: np.ndarray, A_pen: np.ndarray,
+                    B_atk: np.ndarray, B_pen: np.ndarray,
+                    rng: np.random.Generator | None = None,
+                    fast: bool = False) -> Tuple[float, float, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean-field round on fractional counts: every step of run_round replaced
+    by its expectation, E[hits] = sum(cnt * atk), E[assign_j] = hits *
+    cnt_j / sum(cnt), E[kills_j] = assign_j * pen_j. No RNG draws.
+    """
+    a_hits = float(A_cnt @ A_atk)
+    b_hits = float(B_cnt @ B_atk)
+    size_A = A_cnt.sum()
+    size_B = B_cnt.sum()
+    a_assign = a_hits * B_cnt / size_B if size_B > 0 else np.zeros_like(B_cnt)
+    b_assign = b_hits * A_cnt / size_A if size_A > 0 else np.zeros_like(A_cnt)
+    return a_hits, b_hits, a_assign, b_assign, a_assign * B_pen, b_assign * A_pen
+
+# Optional precompiled round kernel (see build_battle_ext.py)
+try:
+    from _battle_ext import run_round as _ext_run_round
+    HAVE_EXT = True
+except ImportError:
+    HAVE_EXT = False
+
+# Numba kernel if available, else the Cython extension, else the NumPy round
+if HAVE_NUMBA:
+    _round_kernel = run_round
+elif HAVE_EXT:
+    _round_kernel = _ext_run_round
+else:
+    _round_kernel = _run_round_numpy
 
 # ------------------------- Battle loop -------------------------
 
+Seed = int | np.random.SeedSequence | None
+
+def _make_rng(seed: Seed, stream_id: int = 0) -> np.random.Generator:
+    """
+    PCG64 generator for stream `stream_id` of the master `seed`.
+    Streams are SeedSequence children (same as seed_seq.spawn(n)[stream_id]),
+    so different stream ids give statistically independent, non-overlapping
+    streams. PCG64(seed).jumped(stream_id) would be an equivalent alternative.
+    """
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    child = np.random.SeedSequence(ss.entropy, spawn_key=ss.spawn_key + (stream_id,))
+    return np.random.Generator(np.random.PCG64(child))
+
 def simulate_battle(army_a: Army,
                     army_b: Army,
                     unit_defs: Dict[str, UnitDef] = default_units,
-                    seed: int | None = None,
-                    max_rounds: int = 100_000) -> Dict[str, Any]:
+                    seed: Seed = None,
+                    max_rounds: int = 100_000,
+                    stream_id: int = 0,
+                    fast: bool = False,
+                    record_rounds: bool = True,
+                    on_round: Callable[[Dict[str, Any]], None] | None = None,
+                    analytic: bool = False) -> Dict[str, Any]:
     """
     Simulate until one army is fully dead or max_rounds reached.
     Returns a report with detailed rounds and a final summary.
+    With record_rounds=False the per-round reports are not built and
+    "rounds" is an empty list; building them dominates the cost of a battle
+    once the combat itself is compiled, so Monte-Carlo callers that only
+    read "summary" should turn it off.
+    If on_round is given, each round report is passed to it as soon as it's
+    built instead of being kept, so memory stays constant for long battles
+    (e.g. on_round=lambda r: f.write(json.dumps(r, default=dict) + "\n")
+    streams JSONL); "rounds" is then empty as well.
+    Per-type maps in round reports are ArmySnapshot views; use dict() on
+    them (or default=dict for json) where a plain dict is needed.
+    Runs with the random stream `stream_id` of `seed` (see _make_rng), so
+    replicates sharing one master seed only need distinct stream ids.
+
+    fast=True fuses hit distribution and defense into one draw per side.
+    Kills per type keep the same distribution as the exact mode (thinning a
+    Multinomial gives a Multinomial), but the random streams differ and the
+    per-type "assigned_hits" in the round report are not tracked (empty).
+
+    analytic=True runs a deterministic mean-field battle instead: each round
+    applies the expected hits and kills (see _expected_round) to fractional
+    counts, and a side below ANALYTIC_MIN_SIZE counts as destroyed. Counts,
+    hits and sizes in the report are then floats. This is a cheap estimate
+    of the typical outcome, not of its distribution: the winner is fixed,
+    so it doesn't give P(A wins), and E[casualties] is only approximated.
     """
-    rng = np.random.default_rng(seed)
-
-    # Deep copies so we don't mutate inputs
-    A: Army = dict(army_a)
-    B: Army = dict(army_b)
+    rng = _make_rng(seed, stream_id)
+
+    idx_of, atk_p, pen_p = _unit_tables(unit_defs)
+    names = list(idx_of)
+
+    # Array copies so we don't mutate inputs
+    A_cnt = _army_counts(army_a, idx_of)
+    B_cnt = _army_counts(army_b, idx_of)
+    if analytic:
+        A_cnt = A_cnt.astype(np.float64)
+        B_cnt = B_cnt.astype(np.float64)
+        kernel = _expected_round
+        alive_at = ANALYTIC_MIN_SIZE
+    else:
+        kernel = _round_kernel
+        alive_at = 1
+    size_A = A_cnt.sum().item()
+    size_B = B_cnt.sum().item()
 
     rounds: List[Dict[str, Any]] = []
     round_idx = 0
 
-    while army_size(A) > 0 and army_size(B) > 0 and round_idx < max_rounds:
+    while size_A >= alive_at and size_B >= alive_at and round_idx < max_rounds:
         round_idx += 1
 
         # --- Attack phases (compute kills without applying) ---
-        # A attacks B
-        a_hits = _attacks_to_hits(A, rng)
-        a_assign = _distribute_hits_across_defender(B, a_hits, rng)
-        a_kills = _defense_resolution(a_assign, rng)
-
-        # B attacks A
-        b_hits = _attacks_to_hits(B, rng)
-        b_assign = _distribute_hits_across_defender(A, b_hits, rng)
-        b_kills = _defense_resolution(b_assign, rng)
-
-        # --- Apply kills simultaneously ---
-        a_deaths = _apply_kills(B, a_kills)  # A kills units in B
-        b_deaths = _apply_kills(A, b_kills)  # B kills units in A
+        a_hits, b_hits, a_assign, b_assign, a_kills, b_kills = kernel(
+            A_cnt, B_cnt, atk_p, pen_p, atk_p, pen_p, rng, fast)
+
+        # --- Apply kills simultaneously (can't kill more than what's available) ---
+        # Dead types stay in the arrays with a count of 0
+        a_deaths = np.minimum(a_kills, B_cnt)  # A kills units in B
+        b_deaths = np.minimum(b_kills, A_cnt)  # B kills units in A
+        B_cnt -= a_deaths
+        A_cnt -= b_deaths
+        size_B -= a_deaths.sum().item()
+        size_A -= b_deaths.sum().item()
+
+        if not record_rounds:
+            continue
 
+        # Per-type maps are lazy views; the kill/assign arrays are fresh each
+        # round, only the live army counts need a copy
         round_report = {
             "round": round_idx,
             "A": {
-                "size_end": army_size(A),
+                "size_end": size_A,
                 "hits": a_hits,
-                "assigned_hits": a_assign,
-                "kills_after_defense": a_kills,
-                "kills": a_deaths,
-                "army": dict(A),
+                "assigned_hits": ArmySnapshot(names, a_assign),
+                "kills_after_defense": ArmySnapshot(names, a_kills),
+                "kills": ArmySnapshot(names, a_deaths),
+                "army": ArmySnapshot(names, A_cnt.copy()),
             },
             "B": {
-                "size_end": army_size(B),
+                "size_end": size_B,
                 "hits": b_hits,
-                "assigned_hits": b_assign,
-                "kills_after_defense": b_kills,
-                "kills": b_deaths,
-                "army": dict(B),
+                "assigned_hits": ArmySnapshot(names, b_assign),
+                "kills_after_defense": ArmySnapshot(names, b_kills),
+                "kills": ArmySnapshot(names, b_deaths),
+                "army": ArmySnapshot(names, B_cnt.copy()),
             },
         }
-        rounds.append(round_report)
+        if on_round is not None:
+            on_round(round_report)
+        else:
+            rounds.append(round_report)
+
+    if analytic:
+        # Fractional remnants below the threshold are treated as destroyed
+        if size_A < alive_at:
+            A_cnt[:] = 0.0
+            size_A = 0.0
+        if size_B < alive_at:
+            B_cnt[:] = 0.0
+            size_B = 0.0
 
     # Determine winner
-    if army_size(A) > 0 and army_size(B) == 0:
+    if size_A > 0 and size_B == 0:
         winner = "A"
-    elif army_size(B) > 0 and army_size(A) == 0:
+    elif size_B > 0 and size_A == 0:
         winner = "B"
     else:
         winner = "Draw/MaxRounds"
@@ -230,9 +542,9 @@ def simulate_battle(army_a: Army,
     summary = {
         "winner": winner,
         "rounds": round_idx,
-        "final_A": dict(A),
-        "final_B": dict(B),
-        "final_sizes": {"A": army_size(A), "B": army_size(B)},
+        "final_A": _counts_to_dict(names, A_cnt),
+        "final_B": _counts_to_dict(names, B_cnt),
+        "final_sizes": {"A": size_A, "B": size_B},
     }
 
     return {
@@ -240,11 +552,166 @@ def simulate_battle(army_a: Army,
         "summary": summary,
     }
 
+# ------------------------- Batch simulation -------------------------
+
+def _multinomial_rows(rng: np.random.Generator, n: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Row-wise Multinomial: split n[i] trials across the columns of weights[i]
+    in proportion to the weights. Drawn as a chain of conditional Binomials
+    (one vectorized call per column), since rng.multinomial can't take a
+    different probability vector per row.
+    """
+    out = np.zeros(weights.shape, dtype=np.int64)
+    if weights.shape[1] == 0:
+        return out
+    remaining_n = n.astype(np.int64)
+    remaining_w = weights.sum(axis=1).astype(np.float64)
+    for j in range(weights.shape[1] - 1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = np.where(remaining_w > 0, weights[:, j] / remaining_w, 0.0)
+        draws = rng.binomial(remaining_n, np.clip(p, 0.0, 1.0))
+        out[:, j] = draws
+        remaining_n -= draws
+        remaining_w -= weights[:, j]
+    out[:, -1] = np.where(weights[:, -1] > 0, remaining_n, 0)
+    return out
+
+def _fused_kills_rows(counts: np.ndarray, pen_p: np.ndarray, total_hits: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Row-wise _fused_kills: the last column collects deflected hits.
+    """
+    weights = counts * pen_p[None, :]
+    deflected = counts.sum(axis=1) - weights.sum(axis=1)
+    return _multinomial_rows(rng, total_hits, np.column_stack([weights, deflected]))[:, :-1]
+
+def simulate_battles(army_a: Army,
+                     army_b: Army,
+                     n_sims: int,
+                     unit_defs: Dict[str, UnitDef] = default_units,
+                     seed: Seed = None,
+                     max_rounds: int = 100_000,
+                     fast: bool = False) -> Dict[str, Any]:
+    """
+    Run n_sims independent battles in lockstep, one row per battle.
+    Same combat rules as simulate_battle, but every RNG step covers all
+    battles still in progress at once. No per-round report is kept; returns
+    win counts/probabilities plus per-battle rounds and final army state.
+    fast has the same meaning as in simulate_battle.
+    """
+    rng = _make_rng(seed)
+
+    idx_of, atk_p, pen_p = _unit_tables(unit_defs)
+    names = list(idx_of)
+    A_cnt = np.tile(_army_counts(army_a, idx_of), (n_sims, 1))
+    B_cnt = np.tile(_army_counts(army_b, idx_of), (n_sims, 1))
+
+    rounds = np.zeros(n_sims, dtype=np.int64)
+    round_idx = 0
+
+    # Battles still in progress are kept compacted in A_live/B_live (rows
+    # map back through live) and only written back when some of them end.
+    live = np.flatnonzero((A_cnt.sum(axis=1) > 0) & (B_cnt.sum(axis=1) > 0))
+    A_live = A_cnt[live]
+    B_live = B_cnt[live]
+
+    while live.size > 0 and round_idx < max_rounds:
+        round_idx += 1
+
+        # Both sides share the unit tables, so each Binomial step covers A's
+        # rows followed by B's rows in a single call
+        n_live = live.size
+        hits = _attacks_to_hits(np.concatenate([A_live, B_live]), atk_p[None, :], rng)
+        a_hits, b_hits = hits[:n_live], hits[n_live:]
+        if fast:
+            a_kills = _fused_kills_rows(B_live, pen_p, a_hits, rng)
+            b_kills = _fused_kills_rows(A_live, pen_p, b_hits, rng)
+        else:
+            assign = np.concatenate([_multinomial_rows(rng, a_hits, B_live), _multinomial_rows(rng, b_hits, A_live)])
+            kills = _defense_resolution(assign, pen_p[None, :], rng)
+            a_kills, b_kills = kills[:n_live], kills[n_live:]
+
+        # Apply kills simultaneously
+        B_live -= np.minimum(a_kills, B_live)
+        A_live -= np.minimum(b_kills, A_live)
+
+        still = (A_live.sum(axis=1) > 0) & (B_live.sum(axis=1) > 0)
+        if not still.all():
+            done = live[~still]
+            rounds[done] = round_idx
+            A_cnt[done] = A_live[~still]
+            B_cnt[done] = B_live[~still]
+            live = live[still]
+            A_live = A_live[still]
+            B_live = B_live[still]
+
+    rounds[live] = round_idx
+    A_cnt[live] = A_live
+    B_cnt[live] = B_live
+
+    return _batch_result(rounds, names, A_cnt, B_cnt)
+
+def _batch_result(rounds: np.ndarray, names: List[str],
+                  A_cnt: np.ndarray, B_cnt: np.ndarray) -> Dict[str, Any]:
+    n_sims = len(rounds)
+    size_A = A_cnt.sum(axis=1)
+    size_B = B_cnt.sum(axis=1)
+    wins_A = int(np.count_nonzero((size_A > 0) & (size_B == 0)))
+    wins_B = int(np.count_nonzero((size_B > 0) & (size_A == 0)))
+    wins = {"A": wins_A, "B": wins_B, "Draw/MaxRounds": n_sims - wins_A - wins_B}
+
+    return {
+        "n_sims": n_sims,
+        "wins": wins,
+        "win_prob": {k: (v / n_sims if n_sims > 0 else 0.0) for k, v in wins.items()},
+        "rounds": rounds,
+        "final_sizes": {"A": size_A, "B": size_B},
+        "final_A": {name: A_cnt[:, i] for i, name in enumerate(names)},
+        "final_B": {name: B_cnt[:, i] for i, name in enumerate(names)},
+    }
+
+def _simulate_replicate(army_a: Army,
+                        army_b: Army,
+                        unit_defs: Dict[str, UnitDef],
+                        max_rounds: int,
+                        fast: bool,
+                        seed_seq: np.random.SeedSequence) -> Dict[str, Any]:
+    return simulate_battle(army_a, army_b, unit_defs, seed=seed_seq, max_rounds=max_rounds,
+                           fast=fast, record_rounds=False)["summary"]
+
+def simulate_battles_parallel(army_a: Army,
+                              army_b: Army,
+                              n_sims: int,
+                              n_workers: int | None = None,
+                              unit_defs: Dict[str, UnitDef] = default_units,
+                              seed: Seed = None,
+                              max_rounds: int = 100_000,
+                              fast: bool = False) -> Dict[str, Any]:
+    """
+    Run n_sims independent simulate_battle replicates across worker processes.
+    The master seed is split with SeedSequence.spawn(n_sims), one child per
+    replicate, so results don't depend on n_workers or scheduling.
+    Returns the same shape as simulate_battles.
+    """
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    children = ss.spawn(n_sims)
+    n_workers = n_workers or os.cpu_count() or 1
+    chunksize = max(1, n_sims // (n_workers * 4))
+
+    run = partial(_simulate_replicate, army_a, army_b, unit_defs, max_rounds, fast)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        summaries = list(executor.map(run, children, chunksize=chunksize))
+
+    names = list(_unit_tables(unit_defs)[0])
+    rounds = np.array([s["rounds"] for s in summaries], dtype=np.int64)
+    A_cnt = np.array([[s["final_A"].get(name, 0) for name in names] for s in summaries], dtype=np.int64).reshape(n_sims, len(names))
+    B_cnt = np.array([[s["final_B"].get(name, 0) for name in names] for s in summaries], dtype=np.int64).reshape(n_sims, len(names))
+    return _batch_result(rounds, names, A_cnt, B_cnt)
+
 # ------------------------- Convenience -------------------------
 
 def simulate_battle_from_specs(spec_a: Dict[str, int],
                                spec_b: Dict[str, int],
-                               seed: int | None = None) -> Dict[str, Any]:
+                               seed: Seed = None) -> Dict[str, Any]:
     A = make_army(spec_a)
     B = make_army(spec_b)
     return simulate_battle(A, B, seed=seed)
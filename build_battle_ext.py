@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Build the optional Cython round kernel (_battle_ext) next to battle_sim.py:
+
+    python build_battle_ext.py build_ext --inplace
+
+Needs Cython and a C compiler. battle_sim falls back to its NumPy round
+when the extension isn't built.
+"""
+import os
+
+import numpy as np
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+numpy_dir = os.path.dirname(np.__file__)
+
+ext = Extension(
+    "_battle_ext",
+    ["_battle_ext.pyx"],
+    include_dirs=[np.get_include()],
+    library_dirs=[os.path.join(numpy_dir, "random", "lib"),
+                  os.path.join(np.get_include(), "..", "lib")],
+    libraries=["npyrandom", "npymath"],
+    define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
+    extra_compile_args=["-O3", "-ffast-math"],
+)
+
+setup(name="battle_ext", ext_modules=cythonize([ext]))
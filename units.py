@@ -1,22 +1,34 @@
 #!/usr/bin/env python3
-from math import floor
 import argparse
 import json
+from functools import lru_cache
 from typing import Tuple, Optional
 
+@lru_cache(maxsize=128)
+def _pack_stats(costs: Tuple[int, ...], props: Tuple[int, ...]) -> Tuple[int, int, Tuple[int, ...], int]:
+    """
+    Stałe pakietu dla (costs, props), liczone raz na parę przy wielokrotnych wywołaniach:
+    (P sztuk w pakiecie, S koszt pakietu, seq sekwencja „częściowego pakietu”, najtańsza jednostka).
+    """
+    P = sum(props)
+    S = sum(c * p for c, p in zip(costs, props))
+    seq = tuple(i for i, p in enumerate(props) for _ in range(p))  # np. (3,2,1) -> (0,0,0,1,1,2)
+    cheapest = min(costs) if costs else 0
+    return P, S, seq, cheapest
+
 def allocate_with_unit0(
     budget: int,
     total_units: int,
     costs: Tuple[int, ...] = (1, 3, 2),     # koszty jednostek 1..k
     props: Tuple[int, ...] = (3, 2, 1),     # proporcje jednostek 1..k (całkowite)
-    unit0_share: float = 0.40,              # udział jednostki 0 (dokładnie floor(share * total_units))
+    unit0_share: float = 0.40,              # udział jednostki 0 (z dokładnością 0.1%, liczone całkowitoliczbowo)
     resource_limit: Optional[int] = None,   # limit zasobu dla jednostki z resource_unit_index (None = brak limitu)
     resource_unit_index: int = 1            # 0-based index: 1 oznacza J2
 ):
     """
     Zwraca słownik z ilościami: unit_0, unit_1..unit_k oraz statystyki.
     Zasady:
-      - unit_0: floor(unit0_share * total_units), koszt 0.
+      - unit_0: total_units * (unit0_share w promilach) // 1000, koszt 0.
       - Jednostki 1..k mieszczą się w budżecie i w limicie sztuk (≤ total_units - unit_0),
         trzymając proporcje przez pełne pakiety + dokładanie reszty.
       - Jednostka z indeksu `resource_unit_index` zużywa 1 zasób/szt., łączny limit `resource_limit`.
@@ -24,13 +36,14 @@ def allocate_with_unit0(
     assert len(costs) == len(props) and all(p > 0 for p in props), "Koszty i proporcje muszą być dodatnie i mieć tę samą długość."
     assert 0 <= resource_unit_index < len(props), "resource_unit_index poza zakresem."
 
-    # 1) Jednostka 0 (darmowa)
-    unit0 = floor(unit0_share * total_units)
+    # 1) Jednostka 0 (darmowa) — arytmetyka całkowita, bo np. floor(0.29 * 100) == 28
+    unit0_permille = round(unit0_share * 1000)
+    unit0 = (total_units * unit0_permille) // 1000
     paid_units_cap = max(0, total_units - unit0)
 
-    # 2) Pakiet proporcji
-    P = sum(props)                                      # sztuk w pakiecie
-    S = sum(c * p for c, p in zip(costs, props))        # koszt pakietu
+    # 2) Pakiet proporcji: P sztuk w pakiecie, S koszt pakietu, seq „częściowy pakiet” (np. (3,2,1) -> (0,0,0,1,1,2))
+    costs, props = tuple(costs), tuple(props)
+    P, S, seq, cheapest = _pack_stats(costs, props)
 
     # 3) Ile pełnych pakietów? (budżet, sztuki, zasób)
     limits = [budget // S if S > 0 else 0, paid_units_cap // P if P > 0 else 0]
@@ -46,15 +59,35 @@ def allocate_with_unit0(
     resource_used = x_paid[resource_unit_index]
     resource_left = None if resource_limit is None else max(0, resource_limit - resource_used)
 
-    # 4) Sekwencja „częściowego pakietu”
-    seq = []
-    for i, p in enumerate(props):
-        seq += [i] * p  # np. (3,2,1) -> [0,0,0,1,1,2]
-
-    # 5) Dokładanie pojedynczych sztuk
-    cheapest = min(costs) if costs else 0
+    # 4) Dokładanie pojedynczych sztuk: przebiegi po `seq`, po jednej sztuce na pozycję.
+    #    Pełne przebiegi (każda aktywna pozycja dostaje +1) liczymy w zamkniętej formie,
+    #    a pozycjami krokowo rozgrywamy tylko przebieg częściowy. Po nim co najmniej jedna
+    #    pozycja wypada na stałe (budżet/zasób tylko maleją), więc pętla ma ≤ k+1 obrotów.
     changed = True
     while changed and units_left > 0 and budget_left >= cheapest:
+        resource_blocked = resource_limit is not None and resource_used >= resource_limit
+        active = [i for i in seq
+                  if costs[i] <= budget_left and not (resource_blocked and i == resource_unit_index)]
+        if not active:
+            break
+
+        pass_cost = sum(costs[i] for i in active)
+        pass_units = len(active)
+        pass_res = active.count(resource_unit_index) if resource_limit is not None else 0
+        passes = [units_left // pass_units]
+        if pass_cost > 0:
+            passes.append(budget_left // pass_cost)
+        if pass_res > 0:
+            passes.append((resource_limit - resource_used) // pass_res)
+        full_passes = min(passes)
+        if full_passes > 0:
+            for i in active:
+                x_paid[i] += full_passes
+            units_left  -= full_passes * pass_units
+            budget_left -= full_passes * pass_cost
+            resource_used += full_passes * pass_res
+
+        # przebieg częściowy
         changed = False
         for i in seq:
             # zasób dla jednostki resource_unit_index
@@ -70,7 +103,7 @@ def allocate_with_unit0(
             if units_left == 0 or budget_left < cheapest:
                 break
 
-    # 6) Wynik
+    # 5) Wynik
     result = {f"unit_{i+1}": x_paid[i] for i in range(len(x_paid))}
     result["unit_0"] = unit0
     result["total_cost"] = sum(c * q for c, q in zip(costs, x_paid))